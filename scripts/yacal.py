@@ -4,11 +4,11 @@ Yandex Calendar CLI via CalDAV.
 
 Usage:
   yacal.py list-calendars
-  yacal.py events [--today | --from DATE] [--to DATE] [--calendar NAME]
+  yacal.py events [--today | --from DATE] [--to DATE] [--calendar NAME | --all-calendars]
   yacal.py create --title TITLE [--description DESC] [--location LOC] [--start DATETIME] [--end DATETIME] [--reminder MINUTES]
   yacal.py update --uid UID [--title TITLE] [--description DESC] [--location LOC] [--start DATETIMЕ] [--end DATETIME]
   yacal.py delete --uid UID
-  yacal.py search --query QUERY
+  yacal.py search --query QUERY [--from DATE] [--to DATE]
   yacal.py list-todos
   yacal.py create-todo --title TITLE [--description DESC] [--tags TAGS] [--priority PRIORITY] [--due DATETIME]
   yacal.py complete-todo --uid UID
@@ -18,6 +18,7 @@ Options:
   --token TOKEN        OAuth token (or set YANDEX_CALENDAR_OAUTH_TOKEN)
   --user-id ID         Yandex user ID (or set YANDEX_CALENDAR_USER_ID)
   --calendar NAME      Calendar name (default: first found)
+  --all-calendars      Events from every calendar (queried in parallel)
   --today              Events for today
   --from DATE          Start date (YYYY-MM-DD)
   --to DATE            End date (YYYY-MM-DD)
@@ -27,7 +28,7 @@ Options:
   --start DATETIME     Start datetime (YYYY-MM-DDTHH:MM:SS)
   --end DATETIME       End datetime (YYYY-MM-DDTHH:MM:SS)
   --reminder MINUTES   Reminder before event in minutes
-  --uid UID            Event/todo UID
+  --uid UID            Event/todo UID (comma-separated for several)
   --query QUERY        Search query
   --tags TAGS          Todo tags (comma-separated)
   --priority PRIORITY  Todo priority (1-9, 1 highest)
@@ -42,21 +43,101 @@ Date formats:
   DATETIME: YYYY-MM-DDTHH:MM:SS (24-hour)
 """
 
+from __future__ import annotations
+
 import os
 import sys
 import json
 import datetime
 import argparse
-from typing import Optional, List, Dict, Any
+import functools
+from urllib.parse import quote
+from typing import TYPE_CHECKING, Optional, List, Dict, Any, Iterable, Iterator
+
+# caldav/icalendar are slow to import, so they are imported where used and
+# `--help` or argument errors never pay for them.
+if TYPE_CHECKING:
+    from caldav import Principal, Calendar, Event
 
-from caldav import DAVClient, Principal, Calendar, Event
-from icalendar import Calendar as ICalendar, Event as IEvent, Todo as VTodo, Alarm, vRecur
-from dateutil import parser as date_parser
+# Optional fast ISO 8601 parser; from 3.11 on the stdlib covers the same
+# inputs (including UTC offsets) so it is only used on older Pythons.
+if sys.version_info < (3, 11):  # pragma: no cover
+    try:
+        from ciso8601 import parse_datetime as _ciso_parse
+    except ImportError:
+        _ciso_parse = None
+else:
+    _ciso_parse = None
 
 
 # Yandex CalDAV endpoint
 YANDEX_CALDAV_URL = "https://caldav.yandex.ru/"
 
+# Event properties matched by `search`
+SEARCH_FIELDS = ('summary', 'description', 'location')
+
+# Event length when no end is given
+DEFAULT_EVENT_DURATION = datetime.timedelta(hours=1)
+
+# Valid VTODO priorities (1 highest)
+TODO_PRIORITIES = tuple(range(1, 10))
+
+# Skeleton for objects simple enough to skip the icalendar object model
+_VCALENDAR_TEMPLATE = (
+    "BEGIN:VCALENDAR\r\n"
+    "VERSION:2.0\r\n"
+    "PRODID:-//Yandex Calendar CLI//\r\n"
+    "BEGIN:{component}\r\n"
+    "{properties}"
+    "END:{component}\r\n"
+    "END:VCALENDAR\r\n"
+)
+
+
+@functools.lru_cache(maxsize=8)
+def _oauth_headers(token: str) -> Dict[str, str]:
+    """OAuth request headers; DAVClient copies them, so sharing is safe."""
+    return {"Authorization": f"OAuth {token}"}
+
+
+def _matches_query(event: Any, q: str) -> bool:
+    """True if lowercased `q` occurs in one of the event's SEARCH_FIELDS."""
+    # str.lower() has an ASCII fast path in CPython; encoding to bytes for
+    # bytes.translate or using re.IGNORECASE measured slower here.
+    get = event.icalendar_component.get
+    for field in SEARCH_FIELDS:
+        value = get(field)
+        if value and q in str(value).lower():
+            return True
+    return False
+
+
+def _with_default(param: str, getter: str):
+    """Decorator filling an omitted calendar argument from the client.
+    
+    `param` may be passed positionally or by keyword; when it is missing or
+    None, `getattr(self, getter)()` is used instead.
+    """
+    def decorate(fn):
+        code = fn.__code__
+        # Position of `param` in *args, i.e. not counting self
+        index = code.co_varnames[:code.co_argcount].index(param) - 1
+        
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            if len(args) > index:
+                if not args[index]:
+                    args = args[:index] + (getattr(self, getter)(),) + args[index + 1:]
+            elif not kwargs.get(param):
+                kwargs[param] = getattr(self, getter)()
+            return fn(self, *args, **kwargs)
+        return wrapper
+    return decorate
+
+
+_default_calendar = _with_default('calendar', 'get_calendar')
+_default_todo_calendar = _with_default('todo_calendar', 'get_todo_calendar')
+
 
 class YandexCalendarClient:
     """Client for Yandex Calendar via CalDAV."""
@@ -67,13 +148,22 @@ class YandexCalendarClient:
         self.username = username
         self.password = password
         self.user_id = user_id
+        # Discovery results, fetched once per client
+        self._principal: Optional[Principal] = None
+        self._calendars: Optional[List[Calendar]] = None
+        self._calendar_cache: Dict[Optional[str], Optional[Calendar]] = {}
+        self._todo_calendar: Optional[Calendar] = None
+        self._todo_calendar_resolved = False
+        # (calendar url, todos?) -> {uid: event}, see _find_by_uid()
+        self._uid_indexes: Dict[tuple, Dict[str, Any]] = {}
+        
+        from caldav import DAVClient
         
         if token:
             # OAuth auth
-            headers = {"Authorization": f"OAuth {token}"}
             self.client = DAVClient(
                 url=YANDEX_CALDAV_URL,
-                headers=headers
+                headers=_oauth_headers(token)
             )
         elif username and password:
             # Basic auth
@@ -87,43 +177,124 @@ class YandexCalendarClient:
     
     def get_principal(self) -> Principal:
         """Get CalDAV principal (user)."""
-        return self.client.principal()
+        if self._principal is None:
+            self._principal = self.client.principal()
+        return self._principal
     
     def get_calendars(self) -> List[Calendar]:
         """Get all calendars."""
-        principal = self.get_principal()
-        return principal.calendars()
+        if self._calendars is None:
+            self._calendars = self.get_principal().calendars()
+        return self._calendars
     
     def get_calendar(self, name: Optional[str] = None) -> Optional[Calendar]:
         """Get calendar by name (or first if name not specified)."""
+        if name in self._calendar_cache:
+            return self._calendar_cache[name]
         calendars = self.get_calendars()
-        if not calendars:
-            return None
+        calendar = None
         if name:
-            for cal in calendars:
-                if cal.name == name:
-                    return cal
-            return None
-        return calendars[0]  # default: first calendar
+            calendar = next((cal for cal in calendars if cal.name == name), None)
+        elif calendars:
+            calendar = calendars[0]  # default: first calendar
+        self._calendar_cache[name] = calendar
+        return calendar
     
     def get_todo_calendar(self) -> Optional[Calendar]:
         """Get todo calendar (named 'Не забыть')."""
-        calendars = self.get_calendars()
-        for cal in calendars:
-            if 'todos' in str(cal.url):
-                return cal
-        return None
+        if not self._todo_calendar_resolved:
+            # Resolved once per client, a missing todo calendar included
+            self._todo_calendar = next(
+                (cal for cal in self.get_calendars() if 'todos' in str(cal.url)), None)
+            self._todo_calendar_resolved = True
+        return self._todo_calendar
     
+    def _index_by_uid(self, calendar: Calendar, todos: bool = False) -> Dict[str, Any]:
+        """Fetch all events (or todos) of calendar and index them by UID.
+        
+        Completed todos are included, as todo_by_uid finds them too.
+        """
+        items = calendar.todos(include_completed=True) if todos else calendar.events()
+        index = {str(item.icalendar_component.get('uid')): item for item in items}
+        self._uid_indexes[(str(calendar.url), todos)] = index
+        return index
+    
+    def _find_by_uid(self, uid: str, calendar: Calendar, todos: bool = False) -> Optional[Any]:
+        """Find an event (or todo) by UID.
+        
+        Events are first fetched directly from `{calendar}/{uid}.ics`, where
+        Yandex stores them. Then a single server-side UID query is tried,
+        then a per-client UID index that is rebuilt on a miss.
+        """
+        from caldav.lib import error as caldav_error
+        
+        if not todos and hasattr(calendar, 'event_by_url'):
+            url = f"{str(calendar.url).rstrip('/')}/{quote(uid, safe='@')}.ics"
+            try:
+                event = calendar.event_by_url(url)
+                # load() keeps the body of non-404 errors as event data, and
+                # accessing the component of an unloaded event refetches it
+                if event.is_loaded() and str(event.icalendar_component.get('uid')) == uid:
+                    return event
+            except (caldav_error.DAVError, ValueError):
+                pass  # stored under another name, look it up by UID
+        
+        lookup = getattr(calendar, 'todo_by_uid' if todos else 'event_by_uid', None)
+        if lookup is not None:
+            try:
+                return lookup(uid)
+            except caldav_error.NotFoundError:
+                return None
+            except caldav_error.DAVError:
+                pass  # server rejected the query, fall back to a full scan
+        index = self._uid_indexes.get((str(calendar.url), todos))
+        if index is None or uid not in index:
+            index = self._index_by_uid(calendar, todos)
+        return index.get(uid)
+    
+    def _find_by_uids(self, uids: Iterable[str], calendar: Calendar,
+                      todos: bool = False) -> Dict[str, Optional[Any]]:
+        """Find several events (or todos) by UID with at most one full fetch."""
+        uids = list(dict.fromkeys(uids))
+        if not uids:
+            return {}
+        if len(uids) == 1:
+            return {uids[0]: self._find_by_uid(uids[0], calendar, todos)}
+        index = self._uid_indexes.get((str(calendar.url), todos))
+        if index is None or any(uid not in index for uid in uids):
+            index = self._index_by_uid(calendar, todos)
+        return {uid: index.get(uid) for uid in uids}
+    
+    def _forget_uid(self, uid: str, calendar: Calendar, todos: bool = False) -> None:
+        """Drop a deleted UID from the cached index."""
+        self._uid_indexes.get((str(calendar.url), todos), {}).pop(uid, None)
+    
+    @_default_calendar
     def get_events(self, calendar: Optional[Calendar] = None,
                    start: Optional[datetime.datetime] = None,
                    end: Optional[datetime.datetime] = None) -> List[Event]:
         """Get events from calendar within date range."""
-        if not calendar:
-            calendar = self.get_calendar()
         if not calendar:
             return []
         return calendar.date_search(start=start, end=end)
     
+    def get_events_all(self, start: Optional[datetime.datetime] = None,
+                       end: Optional[datetime.datetime] = None) -> List[Event]:
+        """Get events from all calendars within date range.
+        
+        Calendars are queried concurrently; the requests are I/O bound, so
+        threads overlap the round-trips.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        
+        calendars = self.get_calendars()
+        if not calendars:
+            return []
+        with ThreadPoolExecutor(max_workers=min(8, len(calendars))) as pool:
+            results = pool.map(lambda cal: cal.date_search(start=start, end=end), calendars)
+            return [event for events in results for event in events]
+    
+    @_default_calendar
     def create_event(self, title: str, description: str = "", location: str = "",
                      start: Optional[datetime.datetime] = None,
                      end: Optional[datetime.datetime] = None,
@@ -131,8 +302,24 @@ class YandexCalendarClient:
                      rrule: Optional[str] = None,
                      calendar: Optional[Calendar] = None) -> Event:
         """Create a new event."""
-        if not calendar:
-            calendar = self.get_calendar()
+        now = datetime.datetime.now()
+        if not start:
+            start = now
+        if not end:
+            end = start + DEFAULT_EVENT_DURATION
+        
+        if not reminder_minutes and not rrule and _is_floating(start) and _is_floating(end):
+            properties = [('SUMMARY', _ical_text(title)),
+                          ('DTSTART', _ical_datetime(start)),
+                          ('DTEND', _ical_datetime(end)),
+                          ('DTSTAMP', _ical_datetime(now) + 'Z')]
+            if description:
+                properties.append(('DESCRIPTION', _ical_text(description)))
+            if location:
+                properties.append(('LOCATION', _ical_text(location)))
+            return calendar.save_event(_render_vcalendar('VEVENT', properties))
+        
+        from icalendar import Calendar as ICalendar, Event as IEvent, Alarm, vRecur
         
         cal = ICalendar()
         cal.add('prodid', '-//Yandex Calendar CLI//')
@@ -145,14 +332,9 @@ class YandexCalendarClient:
         if location:
             event.add('location', location)
         
-        if not start:
-            start = datetime.datetime.now()
-        if not end:
-            end = start + datetime.timedelta(hours=1)
-        
         event.add('dtstart', start)
         event.add('dtend', end)
-        event.add('dtstamp', datetime.datetime.now())
+        event.add('dtstamp', now)
         
         if reminder_minutes:
             alarm = Alarm()
@@ -177,61 +359,113 @@ class YandexCalendarClient:
                      end: Optional[datetime.datetime] = None,
                      calendar: Optional[Calendar] = None) -> Optional[Event]:
         """Update an existing event."""
-        if not calendar:
-            calendar = self.get_calendar()
-        
-        events = calendar.events()
-        for event in events:
+        return self.update_events([uid], title, description, location, start, end, calendar)[uid]
+    
+    @_default_calendar
+    def update_events(self, uids: Iterable[str], title: Optional[str] = None,
+                      description: Optional[str] = None,
+                      location: Optional[str] = None,
+                      start: Optional[datetime.datetime] = None,
+                      end: Optional[datetime.datetime] = None,
+                      calendar: Optional[Calendar] = None) -> Dict[str, Optional[Event]]:
+        """Apply the same changes to several events; maps UID to event or None."""
+        events = self._find_by_uids(uids, calendar)
+        for event in events.values():
+            if not event:
+                continue
             ical = event.icalendar_component
-            if str(ical.get('uid')) == uid:
-                if title:
-                    ical['summary'] = title
-                if description:
-                    ical['description'] = description
-                if location:
-                    ical['location'] = location
-                if start:
-                    ical['dtstart'] = start
-                if end:
-                    ical['dtend'] = end
-                
-                event.save()
-                return event
-        return None
+            if title:
+                ical['summary'] = title
+            if description:
+                ical['description'] = description
+            if location:
+                ical['location'] = location
+            if start:
+                ical['dtstart'] = start
+            if end:
+                ical['dtend'] = end
+            
+            event.save()
+        return events
     
     def delete_event(self, uid: str, calendar: Optional[Calendar] = None) -> bool:
         """Delete an event by UID."""
-        if not calendar:
-            calendar = self.get_calendar()
-        
-        events = calendar.events()
-        for event in events:
-            ical = event.icalendar_component
-            if str(ical.get('uid')) == uid:
+        return self.delete_events([uid], calendar)[uid]
+    
+    @_default_calendar
+    def delete_events(self, uids: Iterable[str], calendar: Optional[Calendar] = None) -> Dict[str, bool]:
+        """Delete several events; maps UID to whether it was found."""
+        results = {}
+        for uid, event in self._find_by_uids(uids, calendar).items():
+            if event:
                 event.delete()
-                return True
-        return False
+                self._forget_uid(uid, calendar)
+            results[uid] = bool(event)
+        return results
     
-    def search_events(self, query: str, calendar: Optional[Calendar] = None) -> List[Event]:
-        """Search events by text (title, description, location)."""
-        if not calendar:
-            calendar = self.get_calendar()
+    @_default_calendar
+    def search_events(self, query: str, calendar: Optional[Calendar] = None,
+                      start: Optional[datetime.datetime] = None,
+                      end: Optional[datetime.datetime] = None) -> Iterator[Event]:
+        """Search events by text (title, description, location).
+        
+        The match runs server-side as a CalDAV text-match, optionally limited
+        to a time range. The i;ascii-casemap collation only folds ASCII, so
+        other queries and servers rejecting the query are scanned locally.
+        Matches are yielded lazily.
+        """
+        from caldav.lib import error as caldav_error
+        
+        if query.isascii() and hasattr(calendar, 'build_search_xml_query'):
+            try:
+                results = self._search_server_side(query, calendar, start, end)
+            except (NotImplementedError, caldav_error.DAVError):
+                pass
+            else:
+                yield from results
+                return
         
-        results = []
-        events = calendar.events()
+        if start or end:
+            # date_search expands whenever end is set, which caldav rejects
+            # without a start
+            events = calendar.search(event=True, start=start, end=end, expand=bool(start and end))
+        else:
+            events = calendar.events()
+        q = query.lower()
         for event in events:
-            ical = event.icalendar_component
-            text = (str(ical.get('summary', '')) + 
-                    str(ical.get('description', '')) + 
-                    str(ical.get('location', ''))).lower()
-            if query.lower() in text:
-                results.append(event)
-        return results
+            if _matches_query(event, q):
+                yield event
     
+    def _search_server_side(self, query: str, calendar: Calendar,
+                            start: Optional[datetime.datetime] = None,
+                            end: Optional[datetime.datetime] = None) -> List[Event]:
+        """Text-match query on each of SEARCH_FIELDS, merged per occurrence.
+        
+        Hits are re-checked locally, since servers may ignore the filter or
+        apply a different collation. Like the local scan, recurring events
+        are expanded when both bounds are given.
+        """
+        from caldav.elements import cdav
+        
+        q = query.lower()
+        results = {}
+        for field in SEARCH_FIELDS:
+            # caldav's summary=/location= keywords use the case-sensitive
+            # i;octet collation, so build the text-match ourselves
+            match = cdav.PropFilter(field.upper()) + cdav.TextMatch(query, collation='i;ascii-casemap')
+            hits = calendar.search(event=True, filters=[match], start=start, end=end,
+                                   expand=bool(start and end))
+            for event in hits:
+                if _matches_query(event, q):
+                    component = event.icalendar_component
+                    when = component.get('recurrence-id') or component.get('dtstart')
+                    key = (str(component.get('uid')), getattr(when, 'dt', None))
+                    results.setdefault(key, event)
+        return list(results.values())
+    
+    @_default_todo_calendar
     def get_todos(self, todo_calendar: Optional[Calendar] = None) -> List[Any]:
         """Get all todos (VTODO)."""
-        if not todo_calendar:
-            todo_calendar = self.get_todo_calendar()
         if not todo_calendar:
             return []
         try:
@@ -245,15 +479,32 @@ class YandexCalendarClient:
                     todos.append(event)
             return todos
     
+    @_default_todo_calendar
     def create_todo(self, title: str, description: str = "", tags: Optional[List[str]] = None,
                     priority: int = 5, due: Optional[datetime.datetime] = None,
                     todo_calendar: Optional[Calendar] = None) -> Optional[Any]:
         """Create a new todo (VTODO)."""
-        if not todo_calendar:
-            todo_calendar = self.get_todo_calendar()
         if not todo_calendar:
             return None
         
+        now = datetime.datetime.now()
+        if due is None or _is_floating(due):
+            # icalendar emits VTODO properties in alphabetical order
+            properties = []
+            if tags:
+                properties.append(('CATEGORIES', ','.join(map(_ical_text, tags))))
+            properties.append(('CREATED', _ical_datetime(now) + 'Z'))
+            if description:
+                properties.append(('DESCRIPTION', _ical_text(description)))
+            if due:
+                properties.append(('DUE', _ical_datetime(due)))
+            properties += [('PRIORITY', str(int(priority))),
+                           ('STATUS', 'NEEDS-ACTION'),
+                           ('SUMMARY', _ical_text(title))]
+            return todo_calendar.save_event(_render_vcalendar('VTODO', properties))
+        
+        from icalendar import Calendar as ICalendar, Todo as VTodo
+        
         cal = ICalendar()
         cal.add('prodid', '-//Yandex Calendar CLI//')
         cal.add('version', '2.0')
@@ -266,7 +517,7 @@ class YandexCalendarClient:
             todo.add('categories', tags)
         todo.add('priority', priority)
         todo.add('status', 'NEEDS-ACTION')
-        todo.add('created', datetime.datetime.now())
+        todo.add('created', now)
         if due:
             todo.add('due', due)
         
@@ -276,53 +527,182 @@ class YandexCalendarClient:
     
     def complete_todo(self, uid: str, todo_calendar: Optional[Calendar] = None) -> bool:
         """Mark a todo as completed."""
+        return self.complete_todos([uid], todo_calendar)[uid]
+    
+    @_default_todo_calendar
+    def complete_todos(self, uids: Iterable[str], todo_calendar: Optional[Calendar] = None) -> Dict[str, bool]:
+        """Mark several todos as completed; maps UID to whether it was found."""
+        uids = list(uids)
         if not todo_calendar:
-            todo_calendar = self.get_todo_calendar()
+            return {uid: False for uid in uids}
         
-        todos = self.get_todos(todo_calendar)
-        for todo in todos:
-            ical = todo.icalendar_component
-            if str(ical.get('uid')) == uid:
+        results = {}
+        for uid, todo in self._find_by_uids(uids, todo_calendar, todos=True).items():
+            if todo:
+                ical = todo.icalendar_component
                 ical['status'] = 'COMPLETED'
                 ical['completed'] = datetime.datetime.now()
                 todo.save()
-                return True
-        return False
+            results[uid] = bool(todo)
+        return results
     
     def delete_todo(self, uid: str, todo_calendar: Optional[Calendar] = None) -> bool:
         """Delete a todo by UID."""
+        return self.delete_todos([uid], todo_calendar)[uid]
+    
+    @_default_todo_calendar
+    def delete_todos(self, uids: Iterable[str], todo_calendar: Optional[Calendar] = None) -> Dict[str, bool]:
+        """Delete several todos; maps UID to whether it was found."""
+        uids = list(uids)
         if not todo_calendar:
-            todo_calendar = self.get_todo_calendar()
+            return {uid: False for uid in uids}
         
-        todos = self.get_todos(todo_calendar)
-        for todo in todos:
-            ical = todo.icalendar_component
-            if str(ical.get('uid')) == uid:
+        results = {}
+        for uid, todo in self._find_by_uids(uids, todo_calendar, todos=True).items():
+            if todo:
                 todo.delete()
-                return True
-        return False
+                self._forget_uid(uid, todo_calendar, todos=True)
+            results[uid] = bool(todo)
+        return results
+
+
+def _is_floating(value: Any) -> bool:
+    """True for naive datetimes, which serialize without TZID or VALUE=DATE."""
+    return isinstance(value, datetime.datetime) and value.tzinfo is None
+
+
+def _ical_text(text: str) -> str:
+    """Escape a TEXT value as in RFC 5545 (same rules as icalendar)."""
+    return (text.replace('\\N', '\n')
+            .replace('\\', '\\\\')
+            .replace(';', '\\;')
+            .replace(',', '\\,')
+            .replace('\r\n', '\\n')
+            .replace('\n', '\\n'))
+
+
+def _ical_datetime(value: datetime.datetime) -> str:
+    """Format a naive datetime as a DATE-TIME value."""
+    return (f"{value.year:04}{value.month:02}{value.day:02}"
+            f"T{value.hour:02}{value.minute:02}{value.second:02}")
+
+
+def _ical_fold(line: str, limit: int = 75) -> str:
+    """Fold a content line to at most `limit` octets, like icalendar."""
+    if line.isascii():
+        return '\r\n '.join(line[i:i + limit - 1] for i in range(0, len(line), limit - 1))
+    chars = []
+    octets = 0
+    for char in line:
+        size = len(char.encode('utf-8'))
+        octets += size
+        if octets >= limit:
+            chars.append('\r\n ')
+            octets = size
+        chars.append(char)
+    return ''.join(chars)
+
+
+def _render_vcalendar(component: str, properties: List[tuple]) -> bytes:
+    """Fill _VCALENDAR_TEMPLATE with already escaped (name, value) pairs."""
+    lines = ''.join(_ical_fold(f"{name}:{value}") + '\r\n' for name, value in properties)
+    return _VCALENDAR_TEMPLATE.format(component=component, properties=lines).encode('utf-8')
+
+
+@functools.lru_cache(maxsize=256)
+def _fixed_offset(offset: datetime.timedelta) -> datetime.timezone:
+    """Shared tzinfo for a UTC offset, so parsed datetimes reuse one instance."""
+    return datetime.timezone(offset)
+
+
+def _share_tzinfo(value: datetime.datetime) -> datetime.datetime:
+    """Swap a fixed-offset tzinfo for the cached instance."""
+    tz = value.tzinfo
+    if type(tz) is not datetime.timezone:
+        return value
+    shared = _fixed_offset(tz.utcoffset(None))
+    return value if shared is tz else value.replace(tzinfo=shared)
 
 
 def parse_date(date_str: str) -> datetime.datetime:
-    """Parse date string to datetime."""
+    """Parse date string to datetime.
+
+    ISO 8601 input (the documented DATE/DATETIME formats) is handled by
+    ciso8601 when available or the stdlib; anything else falls back to
+    dateutil's fuzzy parser.
+    """
+    if _ciso_parse is not None:
+        try:
+            return _share_tzinfo(_ciso_parse(date_str))
+        except ValueError:
+            pass
+    try:
+        # Date-only input yields midnight, same as dateutil
+        return _share_tzinfo(datetime.datetime.fromisoformat(date_str))
+    except ValueError:
+        pass
+    from dateutil import parser as date_parser
     return date_parser.parse(date_str)
 
 
+def write_json(obj: Any) -> None:
+    """Write command output to stdout as indented JSON.
+    
+    The encoded document is written straight to stdout instead of being
+    built up as one str: orjson bytes go to the binary buffer, and the
+    json fallback streams chunks via json.dump.
+    """
+    # Optional faster encoder, imported lazily; output is identical
+    try:
+        import orjson
+    except ImportError:
+        orjson = None
+    buffer = getattr(sys.stdout, 'buffer', None)
+    if orjson is not None and buffer is not None:
+        sys.stdout.flush()
+        buffer.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE))
+        buffer.flush()
+        return
+    json.dump(obj, sys.stdout, indent=2, ensure_ascii=False)
+    sys.stdout.write('\n')
+
+
+def parse_uids(value: str) -> List[str]:
+    """Parse comma-separated UIDs; at least one is required."""
+    uids = [uid.strip() for uid in value.split(',') if uid.strip()]
+    if not uids:
+        raise argparse.ArgumentTypeError(f"no UIDs in {value!r}")
+    return uids
+
+
+def print_batch_result(results: Dict[str, Any], status: str, not_found: str) -> None:
+    """Print per-UID statuses; exit with an error if any UID was not found."""
+    done = [{'status': status, 'uid': uid} for uid, found in results.items() if found]
+    missing = [uid for uid, found in results.items() if not found]
+    if done:
+        write_json(done if len(results) > 1 else done[0])
+    if missing:
+        print(f"Error: {not_found}: {', '.join(missing)}", file=sys.stderr)
+        sys.exit(1)
+
+
 def event_to_dict(event: Event) -> Dict[str, Any]:
     """Format event as dict for output."""
-    ical = event.icalendar_component
+    g = event.icalendar_component.get
+    dtstart = g('dtstart')
+    dtend = g('dtend')
     result = {
-        'uid': str(ical.get('uid', '')),
-        'title': str(ical.get('summary', '')),
-        'description': str(ical.get('description', '')),
-        'location': str(ical.get('location', '')),
-        'start': str(ical.get('dtstart').dt) if ical.get('dtstart') else None,
-        'end': str(ical.get('dtend').dt) if ical.get('dtend') else None,
-        'created': str(ical.get('created', '')),
-        'last_modified': str(ical.get('last-modified', ''))
+        'uid': str(g('uid', '')),
+        'title': str(g('summary', '')),
+        'description': str(g('description', '')),
+        'location': str(g('location', '')),
+        'start': dtstart.dt.isoformat() if dtstart else None,
+        'end': dtend.dt.isoformat() if dtend else None,
+        'created': str(g('created', '')),
+        'last_modified': str(g('last-modified', ''))
     }
     # Add RRULE if present
-    rrule = ical.get('rrule')
+    rrule = g('rrule')
     if rrule:
         result['rrule'] = str(rrule)
     return result
@@ -330,21 +710,164 @@ def event_to_dict(event: Event) -> Dict[str, Any]:
 
 def todo_to_dict(todo: Any) -> Dict[str, Any]:
     """Format todo as dict for output."""
-    ical = todo.icalendar_component
+    g = todo.icalendar_component.get
+    categories = g('categories')
+    due = g('due')
+    completed = g('completed')
     return {
-        'uid': str(ical.get('uid', '')),
-        'title': str(ical.get('summary', '')),
-        'description': str(ical.get('description', '')),
-        'tags': list(ical.get('categories', [])) if ical.get('categories') else [],
-        'priority': int(ical.get('priority', 5)),
-        'status': str(ical.get('status', 'NEEDS-ACTION')),
-        'due': str(ical.get('due').dt) if ical.get('due') else None,
-        'created': str(ical.get('created', '')),
-        'completed': str(ical.get('completed', '')) if ical.get('completed') else None
+        'uid': str(g('uid', '')),
+        'title': str(g('summary', '')),
+        'description': str(g('description', '')),
+        'tags': list(categories) if categories else [],
+        'priority': int(g('priority', 5)),
+        'status': str(g('status', 'NEEDS-ACTION')),
+        'due': due.dt.isoformat() if due else None,
+        'created': str(g('created', '')),
+        'completed': str(completed) if completed else None
     }
 
 
-def main():  # pragma: no cover
+def _cmd_list_calendars(client: YandexCalendarClient, args: argparse.Namespace) -> None:
+    calendars = client.get_calendars()
+    result = []
+    for cal in calendars:
+        result.append({
+            'name': cal.name,
+            'url': str(cal.url)
+        })
+    write_json(result)
+
+
+def _cmd_events(client: YandexCalendarClient, args: argparse.Namespace) -> None:
+    # Determine date range
+    if args.today:
+        start = datetime.datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        end = start + datetime.timedelta(days=1)
+    else:
+        start = parse_date(args.from_date) if args.from_date else datetime.datetime.now()
+        end = parse_date(args.to_date) if args.to_date else start + datetime.timedelta(days=7)
+    
+    if args.all_calendars:
+        events = client.get_events_all(start, end)
+    else:
+        calendar = client.get_calendar(args.calendar)
+        if not calendar:
+            print("Error: No calendar found", file=sys.stderr)
+            sys.exit(1)
+        events = client.get_events(calendar, start, end)
+    result = list(map(event_to_dict, events))
+    write_json(result)
+
+
+def _cmd_create(client: YandexCalendarClient, args: argparse.Namespace) -> None:
+    # Parse datetime
+    start = parse_date(args.start) if args.start else datetime.datetime.now()
+    end = parse_date(args.end) if args.end else start + DEFAULT_EVENT_DURATION
+    
+    event = client.create_event(
+        title=args.title,
+        description=args.description or "",
+        location=args.location or "",
+        start=start,
+        end=end,
+        reminder_minutes=args.reminder,
+        rrule=args.rrule
+    )
+    if event:
+        write_json({
+            'status': 'created',
+            'uid': event.icalendar_component.get('uid')
+        })
+    else:
+        print("Error: Failed to create event", file=sys.stderr)
+        sys.exit(1)
+
+
+def _cmd_update(client: YandexCalendarClient, args: argparse.Namespace) -> None:
+    start = parse_date(args.start) if args.start else None
+    end = parse_date(args.end) if args.end else None
+    
+    events = client.update_events(
+        uids=args.uid,
+        title=args.title,
+        description=args.description,
+        location=args.location,
+        start=start,
+        end=end
+    )
+    print_batch_result(events, 'updated', 'Event not found')
+
+
+def _cmd_delete(client: YandexCalendarClient, args: argparse.Namespace) -> None:
+    print_batch_result(client.delete_events(args.uid), 'deleted', 'Event not found')
+
+
+def _cmd_search(client: YandexCalendarClient, args: argparse.Namespace) -> None:
+    calendar = client.get_calendar()
+    if not calendar:
+        print("Error: No calendar found", file=sys.stderr)
+        sys.exit(1)
+    
+    start = parse_date(args.from_date) if args.from_date else None
+    end = parse_date(args.to_date) if args.to_date else None
+    events = client.search_events(args.query, calendar, start, end)
+    result = list(map(event_to_dict, events))
+    write_json(result)
+
+
+def _cmd_list_todos(client: YandexCalendarClient, args: argparse.Namespace) -> None:
+    todos = client.get_todos()
+    result = list(map(todo_to_dict, todos))
+    write_json(result)
+
+
+def _cmd_create_todo(client: YandexCalendarClient, args: argparse.Namespace) -> None:
+    # Parse tags
+    tags = [t.strip() for t in args.tags.split(',')] if args.tags else []
+    due = parse_date(args.due) if args.due else None
+    
+    todo = client.create_todo(
+        title=args.title,
+        description=args.description or "",
+        tags=tags,
+        priority=args.priority,
+        due=due
+    )
+    if todo:
+        write_json({
+            'status': 'created',
+            'uid': todo.icalendar_component.get('uid')
+        })
+    else:
+        print("Error: Failed to create todo", file=sys.stderr)
+        sys.exit(1)
+
+
+def _cmd_complete_todo(client: YandexCalendarClient, args: argparse.Namespace) -> None:
+    print_batch_result(client.complete_todos(args.uid), 'completed', 'Todo not found')
+
+
+def _cmd_delete_todo(client: YandexCalendarClient, args: argparse.Namespace) -> None:
+    print_batch_result(client.delete_todos(args.uid), 'deleted', 'Todo not found')
+
+
+# Subcommand name -> handler(client, args)
+COMMANDS = {
+    'list-calendars': _cmd_list_calendars,
+    'events': _cmd_events,
+    'create': _cmd_create,
+    'update': _cmd_update,
+    'delete': _cmd_delete,
+    'search': _cmd_search,
+    'list-todos': _cmd_list_todos,
+    'create-todo': _cmd_create_todo,
+    'complete-todo': _cmd_complete_todo,
+    'delete-todo': _cmd_delete_todo,
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the CLI argument parser."""
     parser = argparse.ArgumentParser(description='Yandex Calendar CLI')
     parser.add_argument('--token', help='OAuth token', default=os.getenv('YANDEX_CALENDAR_OAUTH_TOKEN'))
     parser.add_argument('--username', help='Yandex username (for Basic auth)', default=os.getenv('YANDEX_CALENDAR_USERNAME'))
@@ -362,21 +885,23 @@ def main():  # pragma: no cover
     events_group.add_argument('--today', action='store_true', help='Events for today')
     events_group.add_argument('--from', dest='from_date', help='Start date (YYYY-MM-DD)')
     events_parser.add_argument('--to', dest='to_date', help='End date (YYYY-MM-DD)')
-    events_parser.add_argument('--calendar', help='Calendar name')
+    calendar_group = events_parser.add_mutually_exclusive_group()
+    calendar_group.add_argument('--calendar', help='Calendar name')
+    calendar_group.add_argument('--all-calendars', action='store_true', help='Events from all calendars')
     
     # Create event
     create_parser = subparsers.add_parser('create', help='Create event')
     create_parser.add_argument('--title', required=True, help='Event title')
     create_parser.add_argument('--description', help='Event description')
     create_parser.add_argument('--location', help='Event location')
-    create_parser.add_argument('--start', help='Start datetime (YYYY-MM-DDTHH:MM:SS)', default=datetime.datetime.now().isoformat())
+    create_parser.add_argument('--start', help='Start datetime (YYYY-MM-DDTHH:MM:SS, default: now)')
     create_parser.add_argument('--end', help='End datetime (YYYY-MM-DDTHH:MM:SS)')
     create_parser.add_argument('--reminder', type=int, help='Reminder before event in minutes')
     create_parser.add_argument('--rrule', help='Recurrence rule (RRULE), e.g. "FREQ=WEEKLY;BYDAY=WE"')
     
     # Update event
     update_parser = subparsers.add_parser('update', help='Update event')
-    update_parser.add_argument('--uid', required=True, help='Event UID')
+    update_parser.add_argument('--uid', required=True, type=parse_uids, help='Event UID(s), comma-separated')
     update_parser.add_argument('--title', help='New title')
     update_parser.add_argument('--description', help='New description')
     update_parser.add_argument('--location', help='New location')
@@ -385,11 +910,13 @@ def main():  # pragma: no cover
     
     # Delete event
     delete_parser = subparsers.add_parser('delete', help='Delete event')
-    delete_parser.add_argument('--uid', required=True, help='Event UID')
+    delete_parser.add_argument('--uid', required=True, type=parse_uids, help='Event UID(s), comma-separated')
     
     # Search events
     search_parser = subparsers.add_parser('search', help='Search events')
     search_parser.add_argument('--query', required=True, help='Search query')
+    search_parser.add_argument('--from', dest='from_date', help='Start date (YYYY-MM-DD)')
+    search_parser.add_argument('--to', dest='to_date', help='End date (YYYY-MM-DD)')
     
     # List todos
     subparsers.add_parser('list-todos', help='List todos')
@@ -399,18 +926,22 @@ def main():  # pragma: no cover
     create_todo_parser.add_argument('--title', required=True, help='Todo title')
     create_todo_parser.add_argument('--description', help='Todo description')
     create_todo_parser.add_argument('--tags', help='Todo tags (comma-separated)')
-    create_todo_parser.add_argument('--priority', type=int, choices=range(1, 10), default=5, help='Priority (1-9, 1 highest)')
+    create_todo_parser.add_argument('--priority', type=int, choices=TODO_PRIORITIES, default=5, help='Priority (1-9, 1 highest)')
     create_todo_parser.add_argument('--due', help='Due datetime (YYYY-MM-DDTHH:MM:SS)')
     
     # Complete todo
     complete_todo_parser = subparsers.add_parser('complete-todo', help='Mark todo as completed')
-    complete_todo_parser.add_argument('--uid', required=True, help='Todo UID')
+    complete_todo_parser.add_argument('--uid', required=True, type=parse_uids, help='Todo UID(s), comma-separated')
     
     # Delete todo
     delete_todo_parser = subparsers.add_parser('delete-todo', help='Delete todo')
-    delete_todo_parser.add_argument('--uid', required=True, help='Todo UID')
+    delete_todo_parser.add_argument('--uid', required=True, type=parse_uids, help='Todo UID(s), comma-separated')
     
-    args = parser.parse_args()
+    return parser
+
+
+def main(argv: Optional[List[str]] = None):
+    args = build_parser().parse_args(argv)
     
     # Create client
     client = None
@@ -424,142 +955,7 @@ def main():  # pragma: no cover
         sys.exit(1)
     
     try:
-        if args.command == 'list-calendars':
-            calendars = client.get_calendars()
-            result = []
-            for cal in calendars:
-                result.append({
-                    'name': cal.name,
-                    'url': str(cal.url)
-                })
-            print(json.dumps(result, indent=2, ensure_ascii=False))
-            
-        elif args.command == 'events':
-            # Determine date range
-            if args.today:
-                start = datetime.datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-                end = start + datetime.timedelta(days=1)
-            else:
-                start = parse_date(args.from_date) if args.from_date else datetime.datetime.now()
-                end = parse_date(args.to_date) if args.to_date else start + datetime.timedelta(days=7)
-            
-            calendar = client.get_calendar(args.calendar)
-            if not calendar:
-                print("Error: No calendar found", file=sys.stderr)
-                sys.exit(1)
-            
-            events = client.get_events(calendar, start, end)
-            result = [event_to_dict(event) for event in events]
-            print(json.dumps(result, indent=2, ensure_ascii=False))
-            
-        elif args.command == 'create':
-            # Parse datetime
-            start = parse_date(args.start)
-            end = parse_date(args.end) if args.end else start + datetime.timedelta(hours=1)
-            
-            event = client.create_event(
-                title=args.title,
-                description=args.description or "",
-                location=args.location or "",
-                start=start,
-                end=end,
-                reminder_minutes=args.reminder,
-                rrule=args.rrule
-            )
-            if event:
-                print(json.dumps({
-                    'status': 'created',
-                    'uid': event.icalendar_component.get('uid')
-                }, indent=2, ensure_ascii=False))
-            else:
-                print("Error: Failed to create event", file=sys.stderr)
-                sys.exit(1)
-            
-        elif args.command == 'update':
-            start = parse_date(args.start) if args.start else None
-            end = parse_date(args.end) if args.end else None
-            
-            event = client.update_event(
-                uid=args.uid,
-                title=args.title,
-                description=args.description,
-                location=args.location,
-                start=start,
-                end=end
-            )
-            if event:
-                print(json.dumps({
-                    'status': 'updated',
-                    'uid': event.icalendar_component.get('uid')
-                }, indent=2, ensure_ascii=False))
-            else:
-                print("Error: Event not found", file=sys.stderr)
-                sys.exit(1)
-            
-        elif args.command == 'delete':
-            success = client.delete_event(args.uid)
-            if success:
-                print(json.dumps({'status': 'deleted', 'uid': args.uid}, indent=2, ensure_ascii=False))
-            else:
-                print("Error: Event not found", file=sys.stderr)
-                sys.exit(1)
-            
-        elif args.command == 'search':
-            calendar = client.get_calendar()
-            if not calendar:
-                print("Error: No calendar found", file=sys.stderr)
-                sys.exit(1)
-            
-            events = client.search_events(args.query, calendar)
-            result = [event_to_dict(event) for event in events]
-            print(json.dumps(result, indent=2, ensure_ascii=False))
-        
-        elif args.command == 'list-todos':
-            todos = client.get_todos()
-            result = [todo_to_dict(todo) for todo in todos]
-            print(json.dumps(result, indent=2, ensure_ascii=False))
-        
-        elif args.command == 'create-todo':
-            # Parse tags
-            tags = [t.strip() for t in args.tags.split(',')] if args.tags else []
-            due = parse_date(args.due) if args.due else None
-            
-            todo = client.create_todo(
-                title=args.title,
-                description=args.description or "",
-                tags=tags,
-                priority=args.priority,
-                due=due
-            )
-            if todo:
-                print(json.dumps({
-                    'status': 'created',
-                    'uid': todo.icalendar_component.get('uid')
-                }, indent=2, ensure_ascii=False))
-            else:
-                print("Error: Failed to create todo", file=sys.stderr)
-                sys.exit(1)
-        
-        elif args.command == 'complete-todo':
-            success = client.complete_todo(args.uid)
-            if success:
-                print(json.dumps({'status': 'completed', 'uid': args.uid}, indent=2, ensure_ascii=False))
-            else:
-                print("Error: Todo not found", file=sys.stderr)
-                sys.exit(1)
-        
-        elif args.command == 'delete-todo':
-            success = client.delete_todo(args.uid)
-            if success:
-                print(json.dumps({'status': 'deleted', 'uid': args.uid}, indent=2, ensure_ascii=False))
-            else:
-                print("Error: Todo not found", file=sys.stderr)
-                sys.exit(1)
-        
-        else:
-            print(f"Unknown command: {args.command}", file=sys.stderr)
-            sys.exit(1)
-    
+        COMMANDS[args.command](client, args)
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         import traceback
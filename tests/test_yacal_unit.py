@@ -1,7 +1,13 @@
+import argparse
 import datetime as dt
+import json
+import subprocess
+import sys
 from unittest.mock import Mock
 
 import pytest
+from caldav import Calendar, Event
+from caldav.lib import error as caldav_error
 
 from scripts import yacal
 
@@ -24,8 +30,9 @@ class FakeCalendar:
     def events(self):
         return self._events
 
-    def todos(self):
-        return self._todos
+    def todos(self, include_completed=False):
+        return [t for t in self._todos
+                if include_completed or t.icalendar_component.get("status") != "COMPLETED"]
 
 
 class FakeEvent:
@@ -40,6 +47,9 @@ class FakeEvent:
     def delete(self):
         self.deleted = True
 
+    def is_loaded(self):
+        return True
+
 
 class V:
     def __init__(self, value):
@@ -60,6 +70,14 @@ def test_init_requires_auth():
         yacal.YandexCalendarClient()
 
 
+def test_init_with_token_reuses_headers():
+    c1 = yacal.YandexCalendarClient(token="t")
+    c2 = yacal.YandexCalendarClient(token="t")
+    assert c1.client.headers["Authorization"] == "OAuth t"
+    assert yacal._oauth_headers("t") is yacal._oauth_headers("t")
+    assert c2.client.headers is not c1.client.headers
+
+
 def test_init_with_basic_auth():
     c = yacal.YandexCalendarClient(username="u", password="p")
     assert c is not None
@@ -90,6 +108,8 @@ def test_get_todo_calendar_none_when_missing():
     c = make_client()
     c.get_calendars = Mock(return_value=[FakeCalendar(url="https://x/1")])
     assert c.get_todo_calendar() is None
+    assert c.get_todo_calendar() is None
+    c.get_calendars.assert_called_once()
 
 
 def test_get_events_handles_missing_calendar():
@@ -109,6 +129,25 @@ def test_get_events_searches_with_range():
     assert out[2] == end
 
 
+def test_get_events_all_merges_calendars_in_order():
+    c = make_client()
+    cals = [FakeCalendar(str(i)) for i in range(3)]
+    for i, cal in enumerate(cals):
+        cal.date_search = Mock(return_value=[f"e{i}a", f"e{i}b"])
+    c.get_calendars = Mock(return_value=cals)
+    start = dt.datetime(2026, 1, 1)
+
+    assert c.get_events_all(start) == ["e0a", "e0b", "e1a", "e1b", "e2a", "e2b"]
+    for cal in cals:
+        cal.date_search.assert_called_once_with(start=start, end=None)
+
+
+def test_get_events_all_without_calendars():
+    c = make_client()
+    c.get_calendars = Mock(return_value=[])
+    assert c.get_events_all() == []
+
+
 def test_create_event_minimal_and_with_rrule_and_alarm():
     c = make_client()
     cal = FakeCalendar()
@@ -135,6 +174,9 @@ def test_create_event_with_defaults_and_calendar_lookup():
     c.get_calendar = Mock(return_value=cal)
     out = c.create_event(title="Auto")
     assert out["saved"] is True
+    payload = cal.saved_payloads[0].decode()
+    stamp = next(line for line in payload.splitlines() if line.startswith("DTSTAMP"))
+    assert "DTSTART:" + stamp.split(":", 1)[1].rstrip("Z") + "\r\n" in payload
 
 
 def test_update_event_and_not_found():
@@ -188,7 +230,105 @@ def test_search_events_case_insensitive():
     ev2 = FakeEvent(ICalComp(uid="2", summary="Other", description="text", location="place"))
     cal._events = [ev1, ev2]
     res = c.search_events("alp", calendar=cal)
-    assert res == [ev1]
+    assert not isinstance(res, list)
+    assert list(res) == [ev1]
+
+
+def make_caldav_calendar() -> Calendar:
+    return Calendar(client=make_client().client, url=yacal.YANDEX_CALDAV_URL + "calendars/me/events/")
+
+
+def make_caldav_event(cal: Calendar, uid: str, *lines: str) -> Event:
+    data = "\n".join([
+        "BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//test//", "BEGIN:VEVENT",
+        f"UID:{uid}", "DTSTAMP:20260101T000000Z", "DTSTART:20260105T090000Z",
+        "DTEND:20260105T100000Z", *lines, "END:VEVENT", "END:VCALENDAR", "",
+    ])
+    return Event(client=cal.client, url=cal.url.join(f"{uid}.ics"), data=data, parent=cal)
+
+
+def test_search_events_server_side_merges_fields():
+    c = make_client()
+    cal = make_caldav_calendar()
+    ev1 = make_caldav_event(cal, "1", "SUMMARY:Alpha")
+    ev2 = make_caldav_event(cal, "2", "LOCATION:alpine")
+    hits = {"SUMMARY": [ev1], "DESCRIPTION": [ev1], "LOCATION": [ev2]}
+    queries = []
+
+    def report(xml, comp_class, props=None):
+        queries.append(str(xml))
+        return None, next(v for k, v in hits.items() if f'name="{k}"' in queries[-1])
+
+    cal._request_report_build_resultlist = Mock(side_effect=report)
+    start = dt.datetime(2026, 1, 1)
+    end = dt.datetime(2026, 2, 1)
+
+    assert list(c.search_events("alp", calendar=cal, start=start, end=end)) == [ev1, ev2]
+    assert len(queries) == 3
+    assert all('collation="i;ascii-casemap">alp<' in q and "time-range" in q for q in queries)
+
+
+@pytest.mark.parametrize("query", ["standup", "ПЛАНЁРКА"])
+def test_search_events_expands_recurring_events(query):
+    c = make_client()
+    cal = make_caldav_calendar()
+    lines = ("SUMMARY:Standup / Планёрка", "RRULE:FREQ=DAILY;COUNT=3")
+    # Each REPORT yields a fresh copy, as a server would
+    cal._request_report_build_resultlist = Mock(
+        side_effect=lambda *a, **kw: (None, [make_caldav_event(cal, "r", *lines)]))
+    start = dt.datetime(2026, 1, 1, tzinfo=dt.timezone.utc)
+    end = dt.datetime(2026, 2, 1, tzinfo=dt.timezone.utc)
+
+    found = list(c.search_events(query, calendar=cal, start=start, end=end))
+    assert [e.icalendar_component["recurrence-id"].dt.day for e in found] == [5, 6, 7]
+
+
+def test_search_events_server_side_verifies_hits():
+    c = make_client()
+    cal = make_caldav_calendar()
+    ev1 = FakeEvent(ICalComp(uid="1", summary="ALPHA"))
+    ev2 = FakeEvent(ICalComp(uid="2", summary="Other", description="text"))
+    cal.search = Mock(return_value=[ev2, ev1])
+
+    assert list(c.search_events("alp", calendar=cal)) == [ev1]
+
+
+def test_search_events_falls_back_when_server_rejects_query():
+    c = make_client()
+    cal = make_caldav_calendar()
+    ev = FakeEvent(ICalComp(uid="1", summary="Alpha"))
+    cal.search = Mock(side_effect=caldav_error.ReportError("unsupported"))
+    cal.events = Mock(return_value=[ev])
+    assert list(c.search_events("alp", calendar=cal)) == [ev]
+
+
+def test_search_events_non_ascii_scans_date_range():
+    c = make_client()
+    cal = make_caldav_calendar()
+    ev = FakeEvent(ICalComp(uid="1", summary="Совещание"))
+    cal.search = Mock(return_value=[ev])
+    start = dt.datetime(2026, 1, 1)
+    assert list(c.search_events("СОВЕЩ", calendar=cal, start=start)) == [ev]
+    cal.search.assert_called_once_with(event=True, start=start, end=None, expand=False)
+
+
+def test_search_events_non_ascii_with_only_end():
+    c = make_client()
+    cal = make_caldav_calendar()
+    ev = make_caldav_event(cal, "1", "SUMMARY:Встреча")
+    cal._request_report_build_resultlist = Mock(return_value=(None, [ev]))
+    assert list(c.search_events("встреча", calendar=cal, end=dt.datetime(2026, 2, 1))) == [ev]
+    xml = cal._request_report_build_resultlist.call_args.args[0]
+    assert "time-range" in str(xml) and "expand" not in str(xml)
+
+
+def test_search_events_local_scan_matches_within_one_field():
+    c = make_client()
+    cal = FakeCalendar()
+    ev = FakeEvent(ICalComp(uid="1", summary="ab", location="cd"))
+    cal._events = [ev]
+    assert list(c.search_events("bc", calendar=cal)) == []
+    assert list(c.search_events("CD", calendar=cal)) == [ev]
 
 
 def test_search_events_uses_calendar_lookup():
@@ -196,7 +336,7 @@ def test_search_events_uses_calendar_lookup():
     cal = FakeCalendar()
     cal._events = []
     c.get_calendar = Mock(return_value=cal)
-    assert c.search_events("x") == []
+    assert list(c.search_events("x")) == []
 
 
 def test_get_todos_none_and_fallback_events_scan():
@@ -228,7 +368,6 @@ def test_create_complete_delete_todo_flow():
     comp = ICalComp(uid="todo1", status="NEEDS-ACTION")
     todo = FakeEvent(comp)
     cal._todos = [todo]
-    c.get_todos = Mock(return_value=[todo])
 
     assert c.complete_todo("todo1", todo_calendar=cal) is True
     assert comp["status"] == "COMPLETED"
@@ -242,11 +381,99 @@ def test_complete_and_delete_todo_with_lookup_and_false():
     c = make_client()
     cal = FakeCalendar(url="https://x/todos")
     c.get_todo_calendar = Mock(return_value=cal)
-    c.get_todos = Mock(return_value=[])
     assert c.complete_todo("missing") is False
     assert c.delete_todo("missing") is False
 
 
+def test_complete_and_delete_todo_without_todo_calendar():
+    c = make_client()
+    c.get_todo_calendar = Mock(return_value=None)
+    assert c.complete_todo("x") is False
+    assert c.delete_todo("x") is False
+
+
+def test_find_by_uid_prefers_server_side_lookup():
+    c = make_client()
+    cal = FakeCalendar()
+    ev = FakeEvent(ICalComp(uid="u1"))
+    cal.event_by_uid = Mock(return_value=ev)
+    cal.events = Mock(side_effect=AssertionError("full scan"))
+
+    assert c.update_event("u1", title="t", calendar=cal) is ev
+    cal.event_by_uid.assert_called_once_with("u1")
+
+
+def test_find_by_uid_fetches_event_by_url_first():
+    c = make_client()
+    cal = FakeCalendar(url="https://x/cal/")
+    ev = FakeEvent(ICalComp(uid="u 1@x"))
+    cal.event_by_url = Mock(return_value=ev)
+    cal.event_by_uid = Mock(side_effect=AssertionError("uid query"))
+
+    assert c.update_event("u 1@x", title="t", calendar=cal) is ev
+    cal.event_by_url.assert_called_once_with("https://x/cal/u%201@x.ics")
+
+
+def test_find_by_uid_by_url_falls_back_on_404_or_other_uid():
+    c = make_client()
+    cal = FakeCalendar()
+    ev = FakeEvent(ICalComp(uid="u1"))
+    cal.event_by_uid = Mock(return_value=ev)
+
+    cal.event_by_url = Mock(side_effect=caldav_error.NotFoundError("404"))
+    assert c.delete_event("u1", calendar=cal) is True
+    cal.event_by_url = Mock(return_value=FakeEvent(ICalComp(uid="other")))
+    assert c.update_event("u1", title="t", calendar=cal) is ev
+    assert cal.event_by_uid.call_count == 2
+
+
+def test_find_by_uid_by_url_falls_back_on_server_error_page():
+    c = make_client()
+    cal = make_caldav_calendar()
+    ev = FakeEvent(ICalComp(uid="u1"))
+    cal.event_by_uid = Mock(return_value=ev)
+    response = Mock(status=500, raw="<html>Internal Server Error</html>", headers={})
+    cal.client.request = Mock(return_value=response)
+
+    assert c.update_event("u1", title="t", calendar=cal) is ev
+    cal.client.request.assert_called_once()
+    cal.event_by_uid.assert_called_once_with("u1")
+
+
+def test_find_by_uid_not_found_on_server():
+    c = make_client()
+    cal = FakeCalendar()
+    cal.todo_by_uid = Mock(side_effect=caldav_error.NotFoundError("nope"))
+    assert c.complete_todo("u1", todo_calendar=cal) is False
+
+
+def test_find_by_uid_falls_back_to_scan_on_server_error():
+    c = make_client()
+    cal = FakeCalendar()
+    ev = FakeEvent(ICalComp(uid="u1"))
+    cal._events = [ev]
+    cal.event_by_uid = Mock(side_effect=caldav_error.ReportError("unsupported"))
+    assert c.delete_event("u1", calendar=cal) is True
+    assert ev.deleted is True
+
+
+def test_uid_index_is_reused_and_rebuilt_on_miss():
+    c = make_client()
+    cal = FakeCalendar()
+    ev1 = FakeEvent(ICalComp(uid="u1"))
+    cal._events = [ev1]
+    cal.events = Mock(side_effect=lambda: list(cal._events))
+
+    assert c.update_event("u1", title="a", calendar=cal) is ev1
+    assert c.update_event("u1", title="b", calendar=cal) is ev1
+    assert cal.events.call_count == 1
+
+    ev2 = FakeEvent(ICalComp(uid="u2"))
+    cal._events.append(ev2)
+    assert c.update_event("u2", title="c", calendar=cal) is ev2
+    assert cal.events.call_count == 2
+
+
 def test_create_todo_no_calendar_returns_none():
     c = make_client()
     c.get_todo_calendar = Mock(return_value=None)
@@ -258,6 +485,36 @@ def test_parse_date():
     assert d.year == 2026
 
 
+def test_parse_date_date_only_is_midnight():
+    assert yacal.parse_date("2026-02-20") == dt.datetime(2026, 2, 20)
+
+
+def test_parse_date_shares_fixed_offset_tzinfo():
+    a = yacal.parse_date("2026-01-01T10:00:00+03:00")
+    b = yacal.parse_date("2026-06-01T08:30:00+03:00")
+    assert a.utcoffset() == dt.timedelta(hours=3)
+    assert a.tzinfo is b.tzinfo
+    assert yacal.parse_date("2026-01-01T10:00:00").tzinfo is None
+
+
+def test_parse_date_prefers_ciso8601_when_available(monkeypatch):
+    sentinel = dt.datetime(2000, 1, 1)
+    monkeypatch.setattr(yacal, "_ciso_parse", lambda s: sentinel)
+    assert yacal.parse_date("2026-02-20") is sentinel
+
+
+def test_parse_date_ciso8601_error_falls_through(monkeypatch):
+    def reject(s):
+        raise ValueError(s)
+
+    monkeypatch.setattr(yacal, "_ciso_parse", reject)
+    assert yacal.parse_date("2026-02-20T10:00:00") == dt.datetime(2026, 2, 20, 10, 0)
+
+
+def test_parse_date_falls_back_to_dateutil():
+    assert yacal.parse_date("Feb 20 2026 10:00") == dt.datetime(2026, 2, 20, 10, 0)
+
+
 def test_event_to_dict_rrule_and_defaults():
     comp = ICalComp(
         uid="u",
@@ -271,9 +528,18 @@ def test_event_to_dict_rrule_and_defaults():
     ev = FakeEvent(comp)
     out = yacal.event_to_dict(ev)
     assert out["uid"] == "u"
+    assert out["start"] == "2026-01-01T01:00:00"
+    assert out["end"] == "2026-01-01T02:00:00"
     assert out["rrule"]
 
 
+def test_event_to_dict_missing_dates():
+    out = yacal.event_to_dict(FakeEvent(ICalComp(uid="u")))
+    assert out["start"] is None
+    assert out["end"] is None
+    assert "rrule" not in out
+
+
 def test_todo_to_dict():
     comp = ICalComp(
         uid="t",
@@ -290,6 +556,7 @@ def test_todo_to_dict():
     out = yacal.todo_to_dict(t)
     assert out["tags"] == ["a", "b"]
     assert out["priority"] == 3
+    assert out["due"] == "2026-01-02T03:04:05"
 
 
 def test_get_principal_and_get_calendars_delegate():
@@ -299,3 +566,315 @@ def test_get_principal_and_get_calendars_delegate():
     c.client.principal = Mock(return_value=principal)
     assert c.get_principal() is principal
     assert c.get_calendars() == ["c1"]
+
+
+def test_discovery_is_cached_per_client():
+    c = make_client()
+    principal = Mock()
+    principal.calendars.return_value = [FakeCalendar("a", url="https://x/a"), FakeCalendar("t", url="https://x/todos/")]
+    c.client.principal = Mock(return_value=principal)
+
+    assert c.get_calendar().name == "a"
+    assert c.get_calendar("a").name == "a"
+    assert c.get_calendar("missing") is None
+    assert c.get_calendar("missing") is None
+    assert c.get_todo_calendar().name == "t"
+    assert c.get_todo_calendar().name == "t"
+    assert c.get_principal() is principal
+    c.client.principal.assert_called_once()
+    principal.calendars.assert_called_once()
+
+
+def test_batch_operations_fetch_once():
+    c = make_client()
+    cal = FakeCalendar()
+    ev1 = FakeEvent(ICalComp(uid="u1"))
+    ev2 = FakeEvent(ICalComp(uid="u2"))
+    cal.events = Mock(return_value=[ev1, ev2])
+
+    updated = c.update_events(["u1", "u2", "u3"], title="t", calendar=cal)
+    assert updated == {"u1": ev1, "u2": ev2, "u3": None}
+    assert ev1.saved and ev2.saved
+
+    assert c.delete_events(["u1", "u2"], calendar=cal) == {"u1": True, "u2": True}
+    assert ev1.deleted and ev2.deleted
+    assert cal.events.call_count == 1
+
+
+def test_find_by_uids_empty_does_not_fetch():
+    c = make_client()
+    cal = FakeCalendar()
+    cal.events = Mock()
+    assert c._find_by_uids([], cal) == {}
+    cal.events.assert_not_called()
+
+
+def test_batch_todo_operations():
+    c = make_client()
+    cal = FakeCalendar(url="https://x/todos")
+    t1 = FakeEvent(ICalComp(uid="t1"))
+    t2 = FakeEvent(ICalComp(uid="t2"))
+    cal._todos = [t1, t2]
+
+    assert c.complete_todos(["t1", "t2", "t1"], todo_calendar=cal) == {"t1": True, "t2": True}
+    assert t1.icalendar_component["status"] == "COMPLETED"
+    assert c.delete_todos(["t2", "nope"], todo_calendar=cal) == {"t2": True, "nope": False}
+    assert t2.deleted is True
+
+
+def test_batch_todo_operations_include_completed():
+    c = make_client()
+    cal = FakeCalendar(url="https://x/todos")
+    done = FakeEvent(ICalComp(uid="a", status="COMPLETED"))
+    cal._todos = [done, FakeEvent(ICalComp(uid="b"))]
+
+    assert c.delete_todos(["a", "b"], todo_calendar=cal) == {"a": True, "b": True}
+    assert done.deleted is True
+
+
+def test_batch_todo_operations_without_todo_calendar():
+    c = make_client()
+    c.get_todo_calendar = Mock(return_value=None)
+    assert c.complete_todos(["a", "b"]) == {"a": False, "b": False}
+    assert c.delete_todos(["a"]) == {"a": False}
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_write_json_matches_stdlib_format(monkeypatch, capsys, use_orjson):
+    if use_orjson:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setitem(sys.modules, "orjson", None)
+    obj = [{"title": "Встреча", "end": None, "tags": []}]
+    print("before")
+    yacal.write_json(obj)
+    assert capsys.readouterr().out == "before\n" + json.dumps(obj, indent=2, ensure_ascii=False) + "\n"
+
+
+def test_parse_uids():
+    assert yacal.parse_uids("a, b,,c ") == ["a", "b", "c"]
+
+
+@pytest.mark.parametrize("value", ["", " ", ","])
+def test_parse_uids_rejects_empty(value, cli, capsys):
+    with pytest.raises(argparse.ArgumentTypeError):
+        yacal.parse_uids(value)
+    with pytest.raises(SystemExit):
+        yacal.main(["delete", "--uid", value])
+    assert "no UIDs" in capsys.readouterr().err
+    cli.delete_events.assert_not_called()
+
+
+def test_print_batch_result(capsys):
+    yacal.print_batch_result({"a": True}, "deleted", "Event not found")
+    assert '"uid": "a"' in capsys.readouterr().out
+
+    with pytest.raises(SystemExit):
+        yacal.print_batch_result({"a": True, "b": False}, "deleted", "Event not found")
+    captured = capsys.readouterr()
+    assert captured.out.startswith("[")
+    assert "Event not found: b" in captured.err
+
+
+def test_import_does_not_load_caldav():
+    code = ("import sys; import scripts.yacal; "
+            "print('caldav' in sys.modules, 'icalendar' in sys.modules, 'orjson' in sys.modules)")
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=yacal.__file__.rsplit("/scripts/", 1)[0])
+    assert proc.stdout.split() == ["False", "False", "False"]
+
+
+@pytest.fixture
+def cli(monkeypatch):
+    client = Mock()
+    monkeypatch.setattr(yacal, "YandexCalendarClient", Mock(return_value=client))
+    return client
+
+
+def test_main_requires_auth(monkeypatch, capsys):
+    for var in ("YANDEX_CALENDAR_OAUTH_TOKEN", "YANDEX_CALENDAR_USERNAME", "YANDEX_CALENDAR_PASSWORD"):
+        monkeypatch.delenv(var, raising=False)
+    with pytest.raises(SystemExit):
+        yacal.main(["list-calendars"])
+    assert "Authentication required" in capsys.readouterr().err
+
+
+def test_main_list_calendars_with_basic_auth(cli, capsys):
+    cli.get_calendars.return_value = [FakeCalendar("a", url="https://x/a")]
+    yacal.main(["--username", "u", "--password", "p", "list-calendars"])
+    assert '"name": "a"' in capsys.readouterr().out
+    yacal.YandexCalendarClient.assert_called_once_with(username="u", password="p", user_id=None)
+
+
+def test_main_events_today_and_range(cli, capsys):
+    cli.get_events.return_value = [FakeEvent(ICalComp(uid="e1"))]
+    yacal.main(["--token", "t", "events", "--today"])
+    _, start, end = cli.get_events.call_args.args
+    assert end - start == dt.timedelta(days=1)
+    assert '"uid": "e1"' in capsys.readouterr().out
+
+    yacal.main(["--token", "t", "events", "--from", "2026-01-01", "--to", "2026-01-03"])
+    assert cli.get_events.call_args.args[1:] == (dt.datetime(2026, 1, 1), dt.datetime(2026, 1, 3))
+
+
+def test_main_events_all_calendars(cli, capsys):
+    cli.get_events_all.return_value = [FakeEvent(ICalComp(uid="e1"))]
+    yacal.main(["--token", "t", "events", "--all-calendars", "--from", "2026-01-01"])
+    cli.get_calendar.assert_not_called()
+    start, end = cli.get_events_all.call_args.args
+    assert end - start == dt.timedelta(days=7)
+    assert '"uid": "e1"' in capsys.readouterr().out
+
+
+def test_main_events_and_search_without_calendar(cli, capsys):
+    cli.get_calendar.return_value = None
+    for argv in (["events"], ["search", "--query", "x"]):
+        with pytest.raises(SystemExit):
+            yacal.main(["--token", "t", *argv])
+        assert "No calendar found" in capsys.readouterr().err
+
+
+def test_main_create_and_create_todo(cli, capsys):
+    cli.create_event.return_value = FakeEvent(ICalComp(uid="new"))
+    yacal.main(["--token", "t", "create", "--title", "T", "--start", "2026-01-01T10:00:00"])
+    assert cli.create_event.call_args.kwargs["end"] == dt.datetime(2026, 1, 1, 11, 0)
+    assert '"status": "created"' in capsys.readouterr().out
+
+    cli.create_todo.return_value = FakeEvent(ICalComp(uid="todo"))
+    yacal.main(["--token", "t", "create-todo", "--title", "T", "--tags", "a, b", "--due", "2026-01-02"])
+    assert cli.create_todo.call_args.kwargs["tags"] == ["a", "b"]
+    assert '"uid": "todo"' in capsys.readouterr().out
+
+
+def test_main_create_defaults_start_to_now(cli):
+    cli.create_event.return_value = FakeEvent(ICalComp(uid="new"))
+    before = dt.datetime.now()
+    yacal.main(["--token", "t", "create", "--title", "T"])
+    kwargs = cli.create_event.call_args.kwargs
+    assert kwargs["start"] >= before
+    assert kwargs["end"] - kwargs["start"] == dt.timedelta(hours=1)
+
+
+def test_main_create_failures(cli, capsys):
+    cli.create_event.return_value = None
+    cli.create_todo.return_value = None
+    for argv, message in ((["create", "--title", "T"], "Failed to create event"),
+                          (["create-todo", "--title", "T"], "Failed to create todo")):
+        with pytest.raises(SystemExit):
+            yacal.main(["--token", "t", *argv])
+        assert message in capsys.readouterr().err
+
+
+def test_main_uid_commands(cli, capsys):
+    cli.update_events.return_value = {"a": FakeEvent(ICalComp(uid="a"))}
+    cli.delete_events.return_value = {"a": True, "b": True}
+    cli.complete_todos.return_value = {"t": True}
+    cli.delete_todos.return_value = {"t": True}
+
+    yacal.main(["--token", "t", "update", "--uid", "a", "--start", "2026-01-01T10:00:00", "--end", "2026-01-01T11:00:00"])
+    assert cli.update_events.call_args.kwargs["uids"] == ["a"]
+    yacal.main(["--token", "t", "delete", "--uid", "a,b"])
+    cli.delete_events.assert_called_once_with(["a", "b"])
+    yacal.main(["--token", "t", "complete-todo", "--uid", "t"])
+    yacal.main(["--token", "t", "delete-todo", "--uid", "t"])
+    assert capsys.readouterr().out.count('"status"') == 5
+
+
+def test_main_search_and_list_todos(cli, capsys):
+    cli.search_events.return_value = [FakeEvent(ICalComp(uid="s1"))]
+    cli.get_todos.return_value = [FakeEvent(ICalComp(uid="t1"))]
+    yacal.main(["--token", "t", "search", "--query", "q", "--from", "2026-01-01", "--to", "2026-02-01"])
+    yacal.main(["--token", "t", "list-todos"])
+    out = capsys.readouterr().out
+    assert '"uid": "s1"' in out and '"uid": "t1"' in out
+
+
+def test_main_reports_unexpected_errors(cli, capsys):
+    cli.get_calendars.side_effect = RuntimeError("boom")
+    with pytest.raises(SystemExit):
+        yacal.main(["--token", "t", "list-calendars"])
+    assert "Error: boom" in capsys.readouterr().err
+
+
+TRICKY_TEXTS = [
+    "Plain",
+    "Semi;colon, comma\\back\nnew\r\nline \\N",
+    "x" * 200,
+    "Встреча по проекту " * 12,
+]
+
+
+def saved_stamp(payload: bytes, name: bytes) -> dt.datetime:
+    value = payload.split(name + b":", 1)[1][:15].decode()
+    return dt.datetime.strptime(value, "%Y%m%dT%H%M%S")
+
+
+@pytest.mark.parametrize("text", TRICKY_TEXTS)
+def test_create_event_template_matches_icalendar(text):
+    from icalendar import Calendar as ICalendar, Event as IEvent
+
+    start = dt.datetime(2026, 3, 2, 10, 0, 0)
+    end = dt.datetime(2026, 3, 2, 11, 30, 0)
+    cal = FakeCalendar()
+    make_client().create_event(text, description=text, location=text[:10], start=start, end=end, calendar=cal)
+    now = saved_stamp(cal.saved_payloads[0], b"DTSTAMP")
+
+    expected = ICalendar()
+    expected.add("prodid", "-//Yandex Calendar CLI//")
+    expected.add("version", "2.0")
+    event = IEvent()
+    event.add("summary", text)
+    event.add("description", text)
+    event.add("location", text[:10])
+    event.add("dtstart", start)
+    event.add("dtend", end)
+    event.add("dtstamp", now)
+    expected.add_component(event)
+    assert cal.saved_payloads == [expected.to_ical()]
+
+
+@pytest.mark.parametrize("text", TRICKY_TEXTS)
+def test_create_todo_template_matches_icalendar(text):
+    from icalendar import Calendar as ICalendar, Todo as VTodo
+
+    due = dt.datetime(2026, 3, 5, 18, 0, 0)
+    cal = FakeCalendar(url="https://x/todos")
+    make_client().create_todo(text, description=text, tags=["a,b", text[:20]], priority=2, due=due, todo_calendar=cal)
+    now = saved_stamp(cal.saved_payloads[0], b"CREATED")
+
+    expected = ICalendar()
+    expected.add("prodid", "-//Yandex Calendar CLI//")
+    expected.add("version", "2.0")
+    todo = VTodo()
+    todo.add("summary", text)
+    todo.add("description", text)
+    todo.add("categories", ["a,b", text[:20]])
+    todo.add("priority", 2)
+    todo.add("status", "NEEDS-ACTION")
+    todo.add("created", now)
+    todo.add("due", due)
+    expected.add_component(todo)
+    assert cal.saved_payloads == [expected.to_ical()]
+
+
+def test_create_event_and_todo_with_aware_dates_use_icalendar():
+    tz = dt.timezone(dt.timedelta(hours=3))
+    cal = FakeCalendar()
+    make_client().create_event("T", start=dt.datetime(2026, 1, 1, 10, tzinfo=tz), calendar=cal)
+    make_client().create_todo("T", description="D", tags=["x"], due=dt.date(2026, 1, 2), todo_calendar=cal)
+    assert b"DTSTART;TZID=" in cal.saved_payloads[0]
+    assert b"DUE;VALUE=DATE:20260102" in cal.saved_payloads[1]
+
+
+def test_default_calendar_injected_for_positional_and_keyword_calls():
+    c = make_client()
+    cal = FakeCalendar()
+    other = FakeCalendar()
+    c.get_calendar = Mock(return_value=cal)
+
+    assert c.get_events(None, 1, 2) == ["ok", 1, 2]
+    assert c.get_events(start=1) == ["ok", 1, None]
+    assert c.get_calendar.call_count == 2
+    assert c.get_events(other, 3) == ["ok", 3, None]
+    assert c.get_events(calendar=other) == ["ok", None, None]
+    assert c.get_calendar.call_count == 2
+    assert c.get_events.__name__ == "get_events"